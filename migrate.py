@@ -49,219 +49,340 @@
 # SELECT SETVAL('public.store_store_id_seq', COALESCE(MAX(store_id), 1) ) FROM public.store;
 #
 # *************************************************************************************************
+import contextlib
+import mmap
+import os
+import re
+
 CONST_INPUT_FILE_NAME = "sakila-dump.sql"
 CONST_OUTPUT_FILE_NAME = "sakila-converted-to-postgres.sql"
+CONST_READ_BLOCK_SIZE = 1 << 20                     # The dump file is converted in blocks of whole lines of about this many bytes.
+CONST_WRITE_BUFFER_SIZE = 1 << 20                   # Size of the write buffer on the output file, so it is written out in large chunks.
+CONST_DEBUG = False                                 # Set to True to print the tableCount as each CREATE TABLE is converted.
 
-CONST_SERIAL_PRIMARY_KEY ="SERIAL PRIMARY KEY,\n"   # This is the PostgreSQL syntax for an AUTOINCREMENT PRIMARY KEY.
-CONST_PRIMARY_KEY = "PRIMARY KEY("                  # Need to get the primary key field name if it's an AUTOINCREMENT so we can modify the syntax.
-CONST_FOREIGN_KEY = "FOREIGN KEY"                   # All foreign keys are buffered to fk_buffer until all CREATE TABLE declarations are done and all INSERTs are done.
+CONST_SERIAL_PRIMARY_KEY =b"SERIAL PRIMARY KEY,\n"  # This is the PostgreSQL syntax for an AUTOINCREMENT PRIMARY KEY.
+CONST_PRIMARY_KEY = b"PRIMARY KEY("                 # Need to get the primary key field name if it's an AUTOINCREMENT so we can modify the syntax.
+CONST_FOREIGN_KEY = b"FOREIGN KEY"                  # All foreign keys are buffered to fk_lines until all CREATE TABLE declarations are done and all INSERTs are done.
                                                     # Then a sequence of ALTER TABLE <table name> ADD CONSTRAINT ..... are added.
-CONST_CREATE_TABLE = "CREATE TABLE"                 # CREATE TABLE statement, used to buffer all successive lines until we hit ); and we can start modifying syntax.
-CONST_CREATE_TRIGGER_START = "CREATE TRIGGER"       # A Trigger declaration has been found. It's ignored as it's not required by the AWS re/Start Assginment 2022.
-CONST_CREATE_TRIGGER_END = "END;\n"                 #
-CONST_CREATE_VIEW_START = "CREATE VIEW"             # A View declaration has been found. It's ignored as it's not required by the AWS re/Start Assginment 2022.
-CONST_CREATE_VIEW_END = ";\n"                       #
-CONST_BOOL_TRUE = "TRUE"                            # Boolean value changes to 1 (INTEGER).
-CONST_BOOL_FALSE = "FALSE"                          # Boolean value changes to 0 (INTEGER).
-CONST_EXISTS = "EXISTS "                            # This is used to grab the table name.
-CONST_AUTOINCREMENT = " AUTOINCREMENT"              # This keyword is REMOVED. The PK datatype is changed to SERIAL.
-CONST_UNSIGNED = "UNSIGNED"                         # This keyword is REMOVED.
-CONST_DEFAULT = " DEFAUL"                           # film.special_features had NO datatype. This helps to find it in the script and swap in TEXT.
-CONST_DATATYPE_ENUM = "ENUM"                        # Replace ENUM (SQLite)
-CONST_DATATYPE_YEAR = "YEAR"                        # Replace YEAR (SQLite)
-CONST_DATATYPE_TEXT = "TEXT"                        # with TEXT (PostgreSQL)
-CONST_DATATYPE_DATEIME = "DATETIME"                 # Replace DATETIME (SQLite)
-CONST_DATATYPE_TIMESTAMP = "TIMESTAMP"              # with TIMESTAMP (PostgreSQL)
-CONST_DATATYPE_BOOLEAN = "BOOLEAN"                  # Replace BOOLEAN (SQLite)
-CONST_DATATYPE_INT_DEFAULT = "INT DEFAULT"          # Replace INT (SQLite)
-CONST_DATATYPE_MEDIUMINT = "MEDIUMINT"              # Replace MEDIUMINT (SQLite)
-CONST_DATATYPE_INTEGER = "INTEGER"                  # with INTEGER (PostgreSQL)
-CONST_DATATYPE_TINYINT = "TINYINT"                  # Replace TINYINT (SQLite)
-CONST_DATATYPE_SMALLINT = "SMALLINT"                # with SMALLINT (PostgreSQL)
-CONST_DATATYPE_BLOB = "BLOB"                        # Replace BLOB (SQLite)
-CONST_DATATYPE_BYTEA = "BYTEA"                      # with BYTEA (PostgreSQL)
-
-tableCount = 0                                      # NOTE: Was used during development and de-bugging. Let it in as it gives a sense of progress.
-currentTableName = ""                               # When a CREATE TABLE statement is encountered, keep copy of table name in this var.
-foundTable = False
-foundView = False
-foundTrigger = False
-foundTransaction = False
-buffer = []                                         # Used to hold the contents of a CREATE TABLE statement so the syntax can be modified.
-fk_buffer = []                                      # Used to hold ALL foreign key constraints until after ALL INSERT statements have been written out.
-
-def get_table_name(a_line: str):
-    t_name = ""
+CONST_CREATE_TABLE = b"CREATE TABLE"                # CREATE TABLE statement, used to buffer all successive lines until we hit ); and we can start modifying syntax.
+CONST_CREATE_TRIGGER_START = b"CREATE TRIGGER"      # A Trigger declaration has been found. It's ignored as it's not required by the AWS re/Start Assginment 2022.
+CONST_CREATE_TRIGGER_END = b"END;\n"                #
+CONST_CREATE_VIEW_START = b"CREATE VIEW"            # A View declaration has been found. It's ignored as it's not required by the AWS re/Start Assginment 2022.
+CONST_CREATE_VIEW_END = b";\n"                      #
+CONST_COMMIT = b"COMMIT;\n"                         # The dump's own COMMIT is dropped, we write one after the foreign keys have been added.
+CONST_BOOL_TRUE = b"TRUE"                           # Boolean value changes to 1 (INTEGER).
+CONST_BOOL_FALSE = b"FALSE"                         # Boolean value changes to 0 (INTEGER).
+CONST_EXISTS = b"EXISTS "                           # This is used to grab the table name.
+CONST_AUTOINCREMENT = b" AUTOINCREMENT"             # This keyword is REMOVED. The PK datatype is changed to SERIAL.
+CONST_UNSIGNED = b"UNSIGNED"                        # This keyword is REMOVED.
+CONST_DEFAULT = b" DEFAUL"                          # film.special_features had NO datatype. This helps to find it in the script and swap in TEXT.
+CONST_DATATYPE_ENUM = b"ENUM"                       # Replace ENUM (SQLite)
+CONST_DATATYPE_YEAR = b"YEAR"                       # Replace YEAR (SQLite)
+CONST_DATATYPE_TEXT = b"TEXT"                       # with TEXT (PostgreSQL)
+CONST_DATATYPE_DATEIME = b"DATETIME"                # Replace DATETIME (SQLite)
+CONST_DATATYPE_TIMESTAMP = b"TIMESTAMP"             # with TIMESTAMP (PostgreSQL)
+CONST_DATATYPE_BOOLEAN = b"BOOLEAN"                 # Replace BOOLEAN (SQLite)
+CONST_DATATYPE_INT_DEFAULT = b"INT DEFAULT"         # Replace INT (SQLite)
+CONST_DATATYPE_MEDIUMINT = b"MEDIUMINT"             # Replace MEDIUMINT (SQLite)
+CONST_DATATYPE_INTEGER = b"INTEGER"                 # with INTEGER (PostgreSQL)
+CONST_DATATYPE_TINYINT = b"TINYINT"                 # Replace TINYINT (SQLite)
+CONST_DATATYPE_SMALLINT = b"SMALLINT"               # with SMALLINT (PostgreSQL)
+CONST_DATATYPE_BLOB = b"BLOB"                       # Replace BLOB (SQLite)
+CONST_DATATYPE_BYTEA = b"BYTEA"                     # with BYTEA (PostgreSQL)
+
+CONST_STATE_NORMAL = 0                              # States of the line-by-line loop: copying lines straight out,
+CONST_STATE_TABLE = 1                               # buffering a CREATE TABLE statement until we hit );
+CONST_STATE_TRIGGER = 2                             # ignoring a CREATE TRIGGER statement until END;
+CONST_STATE_VIEW = 3                                # ignoring a CREATE VIEW statement until ;
+
+# Tabs become spaces, and carriage returns and double quotes are removed, in one bytes.translate() pass.
+#
+CONST_TRANSLATE_TABLE = bytes.maketrans(b"\t", b" ")
+CONST_TRANSLATE_DELETE = b'\r"'
+
+# All the straight Find & Replace swaps of keywords, applied to each line in a single pass of one
+# compiled regex rather than one str.replace() scan per keyword.
+#
+CONST_TOKENS = {
+    CONST_DATATYPE_DATEIME : CONST_DATATYPE_TIMESTAMP,
+    CONST_UNSIGNED : b"",
+    CONST_DATATYPE_BOOLEAN : CONST_DATATYPE_INTEGER,
+    CONST_DATATYPE_ENUM : CONST_DATATYPE_TEXT,
+    CONST_DATATYPE_YEAR : CONST_DATATYPE_TEXT,
+    CONST_DATATYPE_INT_DEFAULT : CONST_DATATYPE_INTEGER + b" DEFAULT",
+    CONST_DATATYPE_MEDIUMINT : CONST_DATATYPE_INTEGER,
+    CONST_DATATYPE_TINYINT : CONST_DATATYPE_SMALLINT,
+    CONST_DATATYPE_BLOB : CONST_DATATYPE_BYTEA,
+}
+# The TRUE / FALSE swaps only apply to the rest of a line declaring a BOOLEAN field.
+#
+CONST_BOOLEAN_TOKENS = { **CONST_TOKENS, CONST_BOOL_TRUE : b"1", CONST_BOOL_FALSE : b"0" }
+
+# The tokens are tried longest first so, like an Aho-Corasick automaton, the longest token wins when
+# two of them start at the same place. BOOLEAN matches through to the end of the line, so that its
+# TRUE / FALSE default is handled in the same pass instead of needing a separate scan for BOOLEAN.
+#
+def tokens_pattern(tokens: dict, boolean: bool):
+    alternatives = [re.escape(token) for token in sorted(tokens, key=len, reverse=True)
+                    if not (boolean and token == CONST_DATATYPE_BOOLEAN)]
+    if boolean: alternatives.insert(0, re.escape(CONST_DATATYPE_BOOLEAN) + b"[^\n]*")
+    return re.compile(b"|".join(alternatives))
+
+CONST_TOKENS_PATTERN = tokens_pattern(CONST_TOKENS, True)
+CONST_BOOLEAN_TOKENS_PATTERN = tokens_pattern(CONST_BOOLEAN_TOKENS, False)
+
+# A field name with NO datatype, i.e. the first space on the line is followed by " DEFAUL".
+#
+CONST_NO_DATATYPE_PATTERN = re.compile(b"^([^ \n]+ )(?=" + re.escape(CONST_DEFAULT) + b")", re.MULTILINE)
+
+def get_table_name(a_line: bytes):
+    t_name = b""
     pt1 = a_line.find(CONST_EXISTS)
     if pt1 >= 0:
         pt1 += len(CONST_EXISTS)
-        pt2 = a_line.find(" (")
+        pt2 = a_line.find(b" (")
         if pt2 > pt1:
             t_name = a_line[pt1:pt2]
     return t_name
 
-def modify_primary_key_syntax(field_name: str):
-    pt1 = field_name.find(" ")
+def modify_primary_key_syntax(field_name: bytes):
+    pt1 = field_name.find(b" ")
     if pt1 >= 0:
         pt1 += 1
         return field_name[:pt1] + CONST_SERIAL_PRIMARY_KEY
     else:
         return field_name
 
-# open the dump file to read in
+def replace_token(match: re.Match):
+    token = match.group(0)
+    replacement = CONST_TOKENS.get(token)
+    if replacement is None:
+        # It's a BOOLEAN field, so swap the datatype and any TRUE / FALSE in the rest of the line
+        #
+        replacement = CONST_DATATYPE_INTEGER + CONST_BOOLEAN_TOKENS_PATTERN.sub(replace_boolean_token, token[len(CONST_DATATYPE_BOOLEAN):])
+    return replacement
+
+def replace_boolean_token(match: re.Match):
+    return CONST_BOOLEAN_TOKENS[match.group(0)]
+
+# Memory map the dump file. mmap can't map an empty file, so an empty dump is
+# handled as an empty bytes object instead, which gives no blocks.
 #
-with open(CONST_INPUT_FILE_NAME, "r") as sqlite_f:
-    # open a file to write out the modified lines of text
+def map_file(a_file):
+    if os.fstat(a_file.fileno()).st_size == 0: return contextlib.nullcontext(b"")
+    return mmap.mmap(a_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+# Split the memory mapped dump file into blocks of whole lines.
+#
+def read_blocks(sqlite_mm: mmap.mmap):
+    start = 0
+    size = len(sqlite_mm)
+    while start < size:
+        end = sqlite_mm.find(b"\n", start + CONST_READ_BLOCK_SIZE)
+        end = size if end < 0 else end + 1
+        yield sqlite_mm[start:end]
+        start = end
+
+# All the syntax changes that don't depend on what came before the line, applied to a whole block
+# of lines at a time so each one is a single pass in C rather than a Python call per line.
+#
+def transform_block(block: bytes):
+    # These are easy straight swaps so lets perform them all in one pass of the compiled pattern
     #
-    with open(CONST_OUTPUT_FILE_NAME, "w") as postgres_f:
-        # Loop through the sakila-dump.sql file line-by-line and modify the syntax if needed
-        #
-        for line in sqlite_f:
-            # These are easy straight swaps so lets perform a series of Find & Replace statements
-            #
-            line = line.replace("\r", "")
-            line = line.replace("\t", " ").strip() + "\n"
-            line = line.replace('"', "")
-            line = line.replace(CONST_DATATYPE_DATEIME, CONST_DATATYPE_TIMESTAMP)
-            line = line.replace(CONST_UNSIGNED, "")
-            if line.find(CONST_DATATYPE_BOOLEAN) >= 0:
-                line = line.replace(CONST_DATATYPE_BOOLEAN, CONST_DATATYPE_INTEGER)
-                if line.find(CONST_BOOL_TRUE) >= 0:
-                    line = line.replace(CONST_BOOL_TRUE, "1")
-                elif line.find(CONST_BOOL_FALSE) >= 0:
-                    line = line.replace(CONST_BOOL_FALSE, "0")
-            line = line.replace(CONST_DATATYPE_ENUM, CONST_DATATYPE_TEXT)
-            line = line.replace(CONST_DATATYPE_YEAR, CONST_DATATYPE_TEXT)
-            line = line.replace(CONST_DATATYPE_INT_DEFAULT, CONST_DATATYPE_INTEGER + " DEFAULT")
-            line = line.replace(CONST_DATATYPE_MEDIUMINT, CONST_DATATYPE_INTEGER)
-            line = line.replace(CONST_DATATYPE_TINYINT, CONST_DATATYPE_SMALLINT)
-            line = line.replace(CONST_DATATYPE_BLOB, CONST_DATATYPE_BYTEA)
-
-            # Looking for a field name with NO datatype and just setting it to TEXT.
-            # It only occurs once in the sakila.dump file
-            #
-            pt = line.find(" ")
-            if pt > 0:
-                if line[pt+1:pt+8] == CONST_DEFAULT: line = line[:pt+1] + CONST_DATATYPE_TEXT + line[pt+1:]
+    block = block.translate(CONST_TRANSLATE_TABLE, CONST_TRANSLATE_DELETE)
+    block = CONST_TOKENS_PATTERN.sub(replace_token, block)
 
-            # If a CREATE TABLE statement has been found then
-            # reset the buffer and set the boolean foundTable to true
-            #
-            if line.startswith(CONST_CREATE_TABLE):
-                #print("Found a CREATE TABLE line")
-                buffer = []
-                currentTableName = get_table_name(line)
-                foundTable = True
-            
-            # If we have a FOREIGN KEY store it into the fk_buffer list as a dictionary for later processing
-            # and then throw the line away so that it's not processed further.
-            #
-            if line.find(CONST_FOREIGN_KEY) >= 0:
-                if currentTableName != "":
-                    fk_buffer.append({ "table_name" : currentTableName, "fk" : line })
-                    line = ""
-            
-            # If a CREATE TRIGGER statement has been found then
-            # ignore the rest of the text until END;
-            #
-            if line.startswith(CONST_CREATE_TRIGGER_START): foundTrigger = True
-            
-            # If a CREATE VIEW statement has been found then
-            # ignore the rest of the text until ;
+    # Lines only need stripping if there's whitespace at the start or end of one of them, and a few
+    # substring checks rule that out for most blocks, which can then be passed through as they are
+    #
+    if (b"\n " in block or b" \n" in block or block.startswith(b" ") or block.endswith(b" ")
+            or b"\x0b" in block or b"\x0c" in block):
+        block = b"\n".join([line.strip() for line in block.splitlines()]) + b"\n"
+    elif not block.endswith(b"\n"):
+        block += b"\n"
+
+    # Looking for a field name with NO datatype and just setting it to TEXT.
+    # It only occurs once in the sakila.dump file, so first check the block has a " DEFAUL" at all,
+    # which is far cheaper than trying the pattern at the start of every line
+    #
+    if CONST_DEFAULT in block: block = CONST_NO_DATATYPE_PATTERN.sub(b"\\1" + CONST_DATATYPE_TEXT, block)
+    return block
+
+def main():
+    tableCount = 0                                  # NOTE: Was used during development and de-bugging. Printed when CONST_DEBUG is True.
+    currentTableName = b""                          # When a CREATE TABLE statement is encountered, keep copy of table name in this var.
+    state = CONST_STATE_NORMAL
+    foundTransaction = False
+    buffer = []                                     # Used to hold the contents of a CREATE TABLE statement so the syntax can be modified.
+    field_idx = {}                                  # Index into buffer[] of the first line declaring each field name.
+    pk_idx = -1                                     # Index into buffer[] of the AUTOINCREMENT PRIMARY KEY line, which is NOT written out.
+    pk_field_name = b""                             # Name of the AUTOINCREMENT PRIMARY KEY field of the current table.
+    last_idx = -1                                   # Index into buffer[] of the last line written out before the );
+    fk_tables = []                                  # Used to hold ALL foreign key constraints until after ALL INSERT statements have been written out,
+    fk_lines = []                                   # as the table name in fk_tables[] and the constraint line at the same index in fk_lines[].
+
+    # open the dump file to read in
+    #
+    # The file is memory mapped and handled as bytes, so the lines are read straight out of the page cache
+    # with no decoding step.
+    #
+    with open(CONST_INPUT_FILE_NAME, "rb") as sqlite_f, map_file(sqlite_f) as sqlite_mm:
+        # open a file to write out the modified lines of text
+        #
+        with open(CONST_OUTPUT_FILE_NAME, "wb", buffering=CONST_WRITE_BUFFER_SIZE) as postgres_f:
+            # Bind everything used on every line to a local name, so it isn't looked up in the
+            # module or on the object again each time around the loop
             #
-            if line.startswith(CONST_CREATE_VIEW_START): foundView = True
+            write = postgres_f.write
+            buffer_append = buffer.append
+            fk_tables_append = fk_tables.append
+            fk_lines_append = fk_lines.append
 
-            # If we've found a CREATE TABLE statement then keep reading in the lines
-            # and add each one to the buffer[] list. We will modify the syntax once we
-            # have hit the ); characters which when foundTable == True means we've
-            # reached the end of the CREATE TABLE statement.
+            # Loop through the sakila-dump.sql file block-by-block and modify the syntax if needed
             #
-            if foundTable == True:
-                buffer.append(line)
+            for block in map(transform_block, read_blocks(sqlite_mm)):
+                # Sanity check: most blocks are nothing but INSERT statements, so when we're not in the
+                # middle of a CREATE TABLE, TRIGGER or VIEW write the whole block straight out.
+                #
+                if state == CONST_STATE_NORMAL and b"KEY" not in block and b"CREATE" not in block and CONST_COMMIT not in block:
+                    write(block)
+                    continue
 
-                # Look for the end of the CREATE TABLE statement
+                # Otherwise go through the block line-by-line
                 #
-                if line.startswith(");"):
-                    pk_field_name = ""
-                    foundTable = False
+                for line in block.splitlines(keepends=True):
+                    # We ignore trigger and view delcarations completely, so their lines are
+                    # thrown away before anything else is done with them
+                    #
+                    if state == CONST_STATE_TRIGGER:
+                        if CONST_CREATE_TRIGGER_END in line: state = CONST_STATE_NORMAL
+                        continue
+                    if state == CONST_STATE_VIEW:
+                        if CONST_CREATE_VIEW_END in line: state = CONST_STATE_NORMAL
+                        continue
 
-                    # Now we look for PIMARY KEYS and change the syntax
+                    # Sanity check: the vast majority of lines are INSERT statements which can't start or
+                    # be part of a CREATE TABLE, TRIGGER, VIEW or FOREIGN KEY, so write them straight out.
+                    # find() is used rather than in, as a bytes in test first tries its operand as an integer
+                    # and costs several times as much.
                     #
-                    for idx in range(len(buffer)):
-                        a_line = buffer[idx]
+                    if state == CONST_STATE_NORMAL and line.find(b"KEY") < 0 and line.find(b"CREATE") < 0 and line != CONST_COMMIT:
+                        write(line)
+                        continue
 
-                        # If we find the keywords PRIMARY KEY in the line
+                    if state == CONST_STATE_NORMAL:
+                        # If a CREATE TABLE statement has been found then
+                        # empty the buffer (the same list is reused for every table) and start buffering the table
                         #
-                        pt1 = a_line.find(CONST_PRIMARY_KEY)
-                        if pt1 >= 0:
-                            pt1 = pt1 + len(CONST_PRIMARY_KEY)
-
-                            pt2 = a_line.find(" ", pt1)
-                            if pt2 >= pt1:
-                                # Now we look for CONST_AUTOINCREMENT
-                                # 
-                                if a_line.find(CONST_AUTOINCREMENT) >= 0:
-                                    # We extract out the field name for the PRIMARY KEY if it's an AUTOINCREMENT
-                                    # so we can change the syntax
-                                    #
-                                    pk_field_name = a_line[pt1:pt2]
+                        if line.startswith(CONST_CREATE_TABLE):
+                            #print("Found a CREATE TABLE line")
+                            buffer.clear()
+                            field_idx.clear()
+                            pk_idx = -1
+                            pk_field_name = b""
+                            last_idx = -1
+                            currentTableName = get_table_name(line)
+                            state = CONST_STATE_TABLE
 
-                                    # We set this element in the list to empty string, so when we write out the buffer
-                                    # we skip the empty string lines
-                                    #
-                                    buffer[idx] = ""
-                                    break
+                        # If a CREATE TRIGGER statement has been found then
+                        # ignore the rest of the text until END;
+                        #
+                        elif line.startswith(CONST_CREATE_TRIGGER_START):
+                            if CONST_CREATE_TRIGGER_END not in line: state = CONST_STATE_TRIGGER
+                            continue
 
-                    # If we found a primary key field name thats an AUTOINCREMENT, so We start by looping through the buffer
-                    # and when we find the first line that has the field name we modify this line's syntax
+                        # If a CREATE VIEW statement has been found then
+                        # ignore the rest of the text until ;
+                        #
+                        elif line.startswith(CONST_CREATE_VIEW_START):
+                            if CONST_CREATE_VIEW_END not in line: state = CONST_STATE_VIEW
+                            continue
+
+                        # The transaction is committed at the very end, after the ALTER TABLE statements
+                        #
+                        elif line == CONST_COMMIT: continue
+
+                    # If we've found a CREATE TABLE statement then keep reading in the lines
+                    # and add each one to the buffer[] list. We will modify the syntax once we
+                    # have hit the ); characters which in this state means we've
+                    # reached the end of the CREATE TABLE statement.
                     #
-                    if pk_field_name != "":
-                        for idx in range(len(buffer)):
-                            a_line = buffer[idx]
-                            pt1 = a_line.find(pk_field_name)
+                    if state == CONST_STATE_TABLE:
+                        # If we have a FOREIGN KEY store it and its table name into the fk_lines and fk_tables lists for later processing
+                        # and then throw the line away so that it's not processed further.
+                        #
+                        if currentTableName != b"" and CONST_FOREIGN_KEY in line:
+                            fk_tables_append(currentTableName)
+                            fk_lines_append(line)
+                            continue
+
+                        idx = len(buffer)
+                        buffer_append(line)
+
+                        # Keep track of the first line each field name is declared on, the line with the
+                        # AUTOINCREMENT PRIMARY KEY and the last line before the ); while we buffer, so the
+                        # buffer doesn't have to be scanned again once we hit the ); characters
+                        #
+                        field_idx.setdefault(line.split(b" ", 1)[0], idx)
+                        if pk_field_name == b"" and CONST_AUTOINCREMENT in line:
+                            # If we find the keywords PRIMARY KEY in the line
+                            #
+                            pt1 = line.find(CONST_PRIMARY_KEY)
                             if pt1 >= 0:
-                                buffer[idx] = modify_primary_key_syntax(a_line)
-                                break
-                    
-                    # Let's check that the line of text before the ); *doesn't* have a comma , at the end of it
-                    # If it does we remove the comma as it will cause an error in postgres
-                    #
-                    idx = len(buffer) - 1
-                    for a_line in reversed(buffer):
-                        if a_line != "" and a_line.startswith(");") == False:
-                            if a_line.endswith(",\n"): buffer[idx] = a_line[:-2] + "\n"
-                            break
-                        idx -= 1
-                    
-                    # Now we write the modified buffer out to the file sqlite-converted-to-postgres.sql
-                    #
-                    for a_line in buffer:
-                        if (a_line != ""): postgres_f.write(a_line)
+                                pt1 = pt1 + len(CONST_PRIMARY_KEY)
 
-                    currentTableName = ""
-                    tableCount += 1
-                    print("tableCount=" + str(tableCount))
+                                pt2 = line.find(b" ", pt1)
+                                if pt2 >= pt1:
+                                    # We extract out the field name for the PRIMARY KEY if it's an AUTOINCREMENT
+                                    # so we can change the syntax, and skip this line when we write out the buffer
+                                    #
+                                    pk_field_name = line[pt1:pt2]
+                                    pk_idx = idx
+                        if idx != pk_idx and not line.startswith(b");"): last_idx = idx
 
-                    # NOTE: DEBUGGING CODE
-                    #
-                    # if tableCount == 16: break
-                    # END DEBUGGING
-            elif foundTrigger == True:
-                # We ignore trigger delcarations completely
-                #
-                if (a_line.find(CONST_CREATE_TRIGGER_END) >= 0): foundTrigger = False
-            elif foundView == True:
-                # We ignore view delcarations completely
-                #
-                if (a_line.find(CONST_CREATE_VIEW_END) >= 0): foundView = False
-            else:
-                if (line != ""): postgres_f.write(line)
-        
-        if len(fk_buffer) > 0:
-            for fk in fk_buffer:
-                a_line = fk["fk"]
-                if a_line.startswith("\t"): a_line = a_line[1:]
-                if a_line.endswith(",\n"): a_line = a_line[:-2] + ";\n"
-                postgres_f.write("ALTER TABLE " + fk["table_name"] + " ADD " + a_line)
+                        # Look for the end of the CREATE TABLE statement
+                        #
+                        if line.startswith(b");"):
+                            state = CONST_STATE_NORMAL
+
+                            # If we found a primary key field name thats an AUTOINCREMENT, we look up the first line
+                            # that declares the field and modify this line's syntax
+                            #
+                            if pk_field_name != b"":
+                                idx = field_idx.get(pk_field_name)
+                                if idx is not None: buffer[idx] = modify_primary_key_syntax(buffer[idx])
+
+                            # Let's check that the line of text before the ); *doesn't* have a comma , at the end of it
+                            # If it does we remove the comma as it will cause an error in postgres
+                            #
+                            if last_idx >= 0:
+                                a_line = buffer[last_idx]
+                                if a_line.endswith(b",\n"): buffer[last_idx] = a_line[:-2] + b"\n"
+
+                            # Now we drop the PRIMARY KEY line and write the modified buffer out to the file
+                            # sqlite-converted-to-postgres.sql in one go
+                            #
+                            if pk_idx >= 0: del buffer[pk_idx]
+                            write(b"".join(buffer))
+
+                            currentTableName = b""
+                            tableCount += 1
+                            if CONST_DEBUG: print(f"tableCount={tableCount}")
+
+                            # NOTE: DEBUGGING CODE
+                            #
+                            # if tableCount == 16: break
+                            # END DEBUGGING
+                    else:
+                        write(line)
+
+            if len(fk_lines) > 0:
+                for table_name, a_line in zip(fk_tables, fk_lines):
+                    if a_line.startswith(b"\t"): a_line = a_line[1:]
+                    if a_line.endswith(b",\n"): a_line = a_line[:-2] + b";\n"
+                    write(b"ALTER TABLE " + table_name + b" ADD " + a_line)
         
-        postgres_f.write("COMMIT;\n")
+            write(CONST_COMMIT)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# *************************************************************************************************
+# Input / expected output checks for migrate.py
+#
+# Each test writes a small dump to sakila-dump.sql in a temporary directory, runs main() there and
+# compares sakila-converted-to-postgres.sql with the expected text.
+#
+# Run with: python -m unittest
+#
+# *************************************************************************************************
+import os
+import tempfile
+import unittest
+
+import migrate
+
+class MigrateTest(unittest.TestCase):
+    def convert(self, dump: bytes):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.chdir(tmp_dir)
+            try:
+                with open(migrate.CONST_INPUT_FILE_NAME, "wb") as sqlite_f:
+                    sqlite_f.write(dump)
+                migrate.main()
+                with open(migrate.CONST_OUTPUT_FILE_NAME, "rb") as postgres_f:
+                    return postgres_f.read()
+            finally:
+                os.chdir(cwd)
+
+    # The SERIAL rewrite goes on the line declaring the primary key field, not the first line that
+    # merely contains its name (id is in paid)
+    #
+    def test_autoincrement_primary_key_field(self):
+        dump = (b'BEGIN TRANSACTION;\r\n'
+                b'CREATE TABLE IF NOT EXISTS "payment" (\r\n'
+                b'\t"paid"\tINTEGER,\r\n'
+                b'\t"id"\tINTEGER,\r\n'
+                b'\t"amount"\tDECIMAL(5,2) NOT NULL,\r\n'
+                b'\tPRIMARY KEY("id" AUTOINCREMENT)\r\n'
+                b');\r\n'
+                b'COMMIT;\r\n')
+        self.assertEqual(self.convert(dump),
+                         b'BEGIN TRANSACTION;\n'
+                         b'CREATE TABLE IF NOT EXISTS payment (\n'
+                         b'paid INTEGER,\n'
+                         b'id SERIAL PRIMARY KEY,\n'
+                         b'amount DECIMAL(5,2) NOT NULL\n'
+                         b');\n'
+                         b'COMMIT;\n')
+
+    # INT DEFAULT is part of MEDIUMINT DEFAULT, which must still become INTEGER DEFAULT
+    #
+    def test_mediumint_default(self):
+        dump = (b'CREATE TABLE IF NOT EXISTS "film" (\r\n'
+                b'\t"length"\tMEDIUMINT DEFAULT NULL,\r\n'
+                b'\t"rating"\tTINYINT UNSIGNED NOT NULL\r\n'
+                b');\r\n')
+        self.assertEqual(self.convert(dump),
+                         b'CREATE TABLE IF NOT EXISTS film (\n'
+                         b'length INTEGER DEFAULT NULL,\n'
+                         b'rating SMALLINT  NOT NULL\n'
+                         b');\n'
+                         b'COMMIT;\n')
+
+    # Triggers and views are dropped up to their END; or ; line, and the INSERTs after them are kept
+    #
+    def test_trigger_and_view_end(self):
+        dump = (b'BEGIN TRANSACTION;\r\n'
+                b'CREATE TRIGGER `ins_film` AFTER INSERT ON `film` FOR EACH ROW BEGIN\r\n'
+                b'    INSERT INTO film_text (film_id) VALUES (new.film_id);\r\n'
+                b'  END;\r\n'
+                b'INSERT INTO "film" ("film_id") VALUES (1);\r\n'
+                b'CREATE VIEW film_list\r\n'
+                b'AS SELECT film_id FROM film;\r\n'
+                b'INSERT INTO "film" ("film_id") VALUES (2);\r\n'
+                b'COMMIT;\r\n')
+        self.assertEqual(self.convert(dump),
+                         b'BEGIN TRANSACTION;\n'
+                         b'INSERT INTO film (film_id) VALUES (1);\n'
+                         b'INSERT INTO film (film_id) VALUES (2);\n'
+                         b'COMMIT;\n')
+
+    # The dump's own COMMIT is dropped and a single one is written after the foreign keys
+    #
+    def test_commit_after_foreign_keys(self):
+        dump = (b'BEGIN TRANSACTION;\r\n'
+                b'CREATE TABLE IF NOT EXISTS "city" (\r\n'
+                b'\t"city_id"\tINTEGER,\r\n'
+                b'\t"country_id"\tSMALLINT UNSIGNED NOT NULL,\r\n'
+                b'\tCONSTRAINT "fk_city_country" FOREIGN KEY("country_id") REFERENCES "country"("country_id"),\r\n'
+                b'\tPRIMARY KEY("city_id" AUTOINCREMENT)\r\n'
+                b');\r\n'
+                b'INSERT INTO "city" ("city_id","country_id") VALUES (1,87);\r\n'
+                b'COMMIT;\r\n')
+        self.assertEqual(self.convert(dump),
+                         b'BEGIN TRANSACTION;\n'
+                         b'CREATE TABLE IF NOT EXISTS city (\n'
+                         b'city_id SERIAL PRIMARY KEY,\n'
+                         b'country_id SMALLINT  NOT NULL\n'
+                         b');\n'
+                         b'INSERT INTO city (city_id,country_id) VALUES (1,87);\n'
+                         b'ALTER TABLE city ADD CONSTRAINT fk_city_country FOREIGN KEY(country_id) REFERENCES country(country_id);\n'
+                         b'COMMIT;\n')
+
+    def test_empty_dump(self):
+        self.assertEqual(self.convert(b""), b'COMMIT;\n')
+
+if __name__ == "__main__":
+    unittest.main()